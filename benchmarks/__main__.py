@@ -0,0 +1,105 @@
+import argparse
+import sys
+from pathlib import Path
+
+import benchmarks.suite  # noqa: F401 Registers the benchmarks.
+from benchmarks.harness import (
+    BENCHMARKS,
+    DEFAULT_HISTORY,
+    compare,
+    git_commit,
+    load_results,
+    run_benchmarks,
+    save_results,
+)
+
+"""Usage:
+    python -m benchmarks run [--benchmarks NAME ...] [--quick] [--history PATH]
+    python -m benchmarks compare BASELINE CONTENDER [--history PATH]
+
+`run` benchmarks the current checkout and appends the results to the history under the
+current commit. With `--quick`, every benchmark only runs with its first (smallest)
+param and nothing is recorded, which is useful to check that they work. `compare`
+compares the most recent results of two commits (or any other git refs) and exits with
+status 1 if any benchmark got significantly slower.
+"""
+
+
+def _run(args) -> int:
+    results = []
+    for result in run_benchmarks(
+        args.benchmarks, repeat=args.repeat, smallest=args.quick
+    ):
+        print(f"{result.benchmark}[{result.param}]: {result.median * 1e6:.2f} us")
+        results.append(result)
+
+    # Quick runs are incomplete, so they should not be compared against full runs.
+    if args.quick:
+        return 0
+
+    commit = git_commit()
+    save_results(results, commit, args.history)
+    print(f"Saved results for {commit} to {args.history}.")
+    return 0
+
+
+def _compare(args) -> int:
+    baseline = load_results(git_commit(args.baseline), args.history)
+    contender = load_results(git_commit(args.contender), args.history)
+
+    comparisons = compare(baseline, contender, args.alpha, args.threshold)
+    for c in comparisons:
+        flag = "REGRESSION" if c.regression else ""
+        print(
+            f"{c.benchmark + '[' + c.param + ']':<50} {c.baseline * 1e6:>12.2f} us "
+            f"{c.contender * 1e6:>12.2f} us {c.ratio:>7.2f}x  p={c.p_value:.4f}  {flag}"
+        )
+
+    regressions = [c for c in comparisons if c.regression]
+    print(f"{len(regressions)} of {len(comparisons)} benchmarks regressed.")
+    return 1 if regressions else 0
+
+
+def main(argv=None) -> int:
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--history", type=Path, default=DEFAULT_HISTORY)
+
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser(
+        "run", parents=[common], help="Run and record the benchmarks."
+    )
+    run_parser.add_argument("--benchmarks", nargs="+", choices=sorted(BENCHMARKS))
+    run_parser.add_argument("--repeat", type=int, default=15)
+    run_parser.add_argument(
+        "--quick",
+        action="store_true",
+        help="Only run the smallest param of every benchmark, without recording.",
+    )
+    run_parser.set_defaults(func=_run)
+
+    compare_parser = subparsers.add_parser(
+        "compare",
+        parents=[common],
+        help="Compare the recorded results of two commits.",
+    )
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("contender")
+    compare_parser.add_argument(
+        "--alpha", type=float, default=0.01, help="Significance level."
+    )
+    compare_parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.05,
+        help="Minimum relative slowdown to count as a regression.",
+    )
+    compare_parser.set_defaults(func=_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,195 @@
+import datetime
+import json
+import math
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+"""Minimal benchmark harness that records results in a JSON lines history file and
+compares the results of two commits."""
+
+DEFAULT_HISTORY = Path(__file__).parent / "history.jsonl"
+
+
+@dataclass
+class Benchmark:
+    """A benchmark is a setup function that is called with each of `params` and returns
+    the function that should be timed.
+
+    The setup function is called again for every sample, so benchmarks that measure
+    one-off costs (e.g. first access) can create fresh state every time. If `number` is
+    None, the timed function is called as many times as needed for a sample to take at
+    least `min_sample_time` seconds.
+    """
+
+    name: str
+    setup: Callable[[Any], Callable[[], Any]]
+    params: Sequence[Any]
+    number: Optional[int] = None
+
+
+@dataclass
+class Result:
+    benchmark: str
+    param: str
+    # Seconds per call of the timed function, one for every sample.
+    samples: List[float] = field(default_factory=list)
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.samples)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, params: Sequence[Any], number: Optional[int] = None):
+    """Decorator that registers a setup function as a benchmark."""
+
+    def wrapped(setup):
+        if name in BENCHMARKS:
+            raise ValueError(f"A benchmark named {name} already exists.")
+        BENCHMARKS[name] = Benchmark(name, setup, params, number)
+        return setup
+
+    return wrapped
+
+
+def _calibrate(func: Callable[[], Any], min_sample_time: float) -> int:
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_sample_time:
+            return number
+        number *= 2
+
+
+def run_benchmark(
+    bench: Benchmark, param: Any, repeat: int = 15, min_sample_time: float = 0.01
+) -> Result:
+    number = bench.number or _calibrate(bench.setup(param), min_sample_time)
+    result = Result(bench.name, str(param))
+    for _ in range(repeat):
+        func = bench.setup(param)
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        result.samples.append((time.perf_counter() - start) / number)
+    return result
+
+
+def run_benchmarks(
+    names: Optional[Sequence[str]] = None, repeat: int = 15, smallest: bool = False
+) -> Iterator[Result]:
+    """Run the given benchmarks (or all of them) with all their params, or only with
+    the first one if `smallest` is set."""
+    for name in names or sorted(BENCHMARKS):
+        bench = BENCHMARKS[name]
+        for param in bench.params[:1] if smallest else bench.params:
+            yield run_benchmark(bench, param, repeat=repeat)
+
+
+def git_commit(ref: str = "HEAD") -> str:
+    return subprocess.run(
+        ["git", "rev-parse", ref],
+        stdout=subprocess.PIPE,
+        cwd=Path(__file__).parent,
+        universal_newlines=True,
+        check=True,
+    ).stdout.strip()
+
+
+def save_results(results: Sequence[Result], commit: str, history: Path):
+    """Append a run of `results` for `commit` to the history file."""
+    record = {
+        "commit": commit,
+        "timestamp": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": [result.__dict__ for result in results],
+    }
+    history.parent.mkdir(parents=True, exist_ok=True)
+    with open(history, "a") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def load_results(commit: str, history: Path) -> Dict[tuple, Result]:
+    """Returns the results of the most recent run for `commit` in the history file,
+    keyed by benchmark name and param."""
+    runs = [
+        record
+        for record in map(json.loads, history.read_text().splitlines())
+        if record["commit"] == commit
+    ]
+    if not runs:
+        raise ValueError(f"No benchmark results for commit {commit} in {history}.")
+
+    results = (Result(**result) for result in runs[-1]["results"])
+    return {(result.benchmark, result.param): result for result in results}
+
+
+def mann_whitney_p_value(a: Sequence[float], b: Sequence[float]) -> float:
+    """Two-sided p-value of the Mann-Whitney U test, using the normal approximation.
+
+    Timings are rarely normally distributed, so this is more robust than a t-test.
+    """
+    combined = sorted([(x, 0) for x in a] + [(x, 1) for x in b])
+    # Assign average ranks to ties.
+    ranks = [0.0] * len(combined)
+    i = 0
+    while i < len(combined):
+        j = i
+        while j + 1 < len(combined) and combined[j + 1][0] == combined[i][0]:
+            j += 1
+        for k in range(i, j + 1):
+            ranks[k] = (i + j) / 2 + 1
+        i = j + 1
+
+    n_a, n_b = len(a), len(b)
+    rank_sum_a = sum(rank for rank, (_, group) in zip(ranks, combined) if group == 0)
+    u = rank_sum_a - n_a * (n_a + 1) / 2
+    mean = n_a * n_b / 2
+    std = math.sqrt(n_a * n_b * (n_a + n_b + 1) / 12)
+    if std == 0:
+        return 1.0
+    z = (abs(u - mean) - 0.5) / std
+    return min(1.0, math.erfc(max(z, 0) / math.sqrt(2)))
+
+
+@dataclass
+class Comparison:
+    benchmark: str
+    param: str
+    baseline: float
+    contender: float
+    p_value: float
+    regression: bool
+
+    @property
+    def ratio(self) -> float:
+        return self.contender / self.baseline
+
+
+def compare(
+    baseline: Dict[tuple, Result],
+    contender: Dict[tuple, Result],
+    alpha: float = 0.01,
+    threshold: float = 0.05,
+) -> List[Comparison]:
+    """Compare the results that exist in both runs. A result is flagged as a regression
+    if it is significantly slower (p < `alpha`) by more than `threshold`."""
+    comparisons = []
+    for key in sorted(baseline.keys() & contender.keys()):
+        a, b = baseline[key], contender[key]
+        p_value = mann_whitney_p_value(a.samples, b.samples)
+        regression = p_value < alpha and b.median > a.median * (1 + threshold)
+        comparisons.append(
+            Comparison(key[0], key[1], a.median, b.median, p_value, regression)
+        )
+    return comparisons
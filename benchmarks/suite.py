@@ -0,0 +1,312 @@
+import contextlib
+import functools
+import io
+import itertools
+import multiprocessing
+import os
+import random
+import shutil
+import string
+import tempfile
+from concurrent.futures import Future
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.harness import benchmark
+from practipy import cache, gcloud, text
+from practipy.classes import Dict
+from practipy.imports import LazyModule
+from practipy.iterators import batch
+from practipy.math import logit, sigmoid
+from practipy.testing import LazyMockMeta, MockMeta
+from practipy.typing import typed
+
+"""Benchmarks of the practipy helpers that are used in hot code."""
+
+SIZES = [10, 1000, 100_000]
+
+
+def _random_words(n: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    return ["".join(rng.choices(string.ascii_letters, k=8)) for _ in range(n)]
+
+
+@benchmark("iterators.batch", params=SIZES)
+def bench_batch(n):
+    data = list(range(n))
+    return lambda: list(batch(data, 32))
+
+
+# The inputs are cached, because setup functions are called for every sample.
+@functools.lru_cache(maxsize=None)
+def _dicts(n):
+    # Two dicts that share half of their keys.
+    keys = _random_words(n + n // 2)
+    return Dict.fromkeys(keys[:n], 0), Dict.fromkeys(keys[n // 2 :], 1)
+
+
+@benchmark("classes.Dict.union", params=SIZES)
+def bench_dict_union(n):
+    a, b = _dicts(n)
+    return lambda: a.union(b)
+
+
+@benchmark("classes.Dict.intersection", params=SIZES)
+def bench_dict_intersection(n):
+    a, b = _dicts(n)
+    return lambda: a.intersection(b)
+
+
+@benchmark("classes.Dict.difference", params=SIZES)
+def bench_dict_difference(n):
+    a, b = _dicts(n)
+    return lambda: a.difference(b)
+
+
+@benchmark("classes.Dict.symmetric_difference", params=SIZES)
+def bench_dict_symmetric_difference(n):
+    a, b = _dicts(n)
+    return lambda: a.symmetric_difference(b)
+
+
+def _add(a: int, b: int) -> int:
+    return a + b
+
+
+_typed_add = typed(_add)
+
+
+@benchmark("typing.typed", params=["untyped", "typed"])
+def bench_typed(variant):
+    func = _typed_add if variant == "typed" else _add
+    return lambda: func(1, 2)
+
+
+@functools.lru_cache(maxsize=None)
+def _camel_case(n):
+    return "".join(word.capitalize() for word in _random_words(n))
+
+
+@benchmark("text.camel2snake", params=[1, 10, 1000])
+def bench_camel2snake(n):
+    string = _camel_case(n)
+    return lambda: text.camel2snake(string)
+
+
+@benchmark("text.camel2words", params=[1, 10, 1000])
+def bench_camel2words(n):
+    string = _camel_case(n)
+    return lambda: text.camel2words(string)
+
+
+@benchmark("text.snake2camel", params=[1, 10, 1000])
+def bench_snake2camel(n):
+    string = "_".join(_random_words(n)).lower()
+    return lambda: text.snake2camel(string)
+
+
+@functools.lru_cache(maxsize=None)
+def _probabilities(n):
+    import numpy as np
+
+    return np.random.default_rng(0).uniform(0.01, 0.99, size=n)
+
+
+@benchmark("math.sigmoid", params=SIZES)
+def bench_sigmoid(n):
+    x = _probabilities(n)
+    return lambda: sigmoid(x)
+
+
+@benchmark("math.logit", params=SIZES)
+def bench_logit(n):
+    x = _probabilities(n)
+    return lambda: logit(x)
+
+
+# Use a separate cache so that the benchmarks don't touch the actual one.
+_cache_dir = tempfile.TemporaryDirectory(prefix="practipy_benchmark_cache")
+_cache_keys = itertools.count()
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_function(payload_size: int):
+    diskcache = cache.diskcache.Cache(f"{_cache_dir.name}/{payload_size}")
+
+    @cache.cache_disk
+    def payload(i):
+        return b"x" * payload_size
+
+    # The disk cache is opened on the first call, so do that while it is replaced.
+    with mock.patch.object(cache, "_get_cache", lambda: diskcache):
+        payload(next(_cache_keys))
+
+    return payload
+
+
+@benchmark("cache.cache_disk.hit", params=[10, 10_000, 1_000_000])
+def bench_cache_hit(payload_size):
+    payload = _cached_function(payload_size)
+    payload(0)
+    return lambda: payload(0)
+
+
+@benchmark("cache.cache_disk.miss", params=[10, 10_000, 1_000_000], number=100)
+def bench_cache_miss(payload_size):
+    payload = _cached_function(payload_size)
+    return lambda: payload(next(_cache_keys))
+
+
+@benchmark("imports.LazyModule.first_access", params=["json", "os", "numpy"], number=1)
+def bench_lazy_module_first_access(module_name):
+    # Make sure only the cost of the proxy is measured, not the actual import.
+    __import__(module_name)
+    modules = [LazyModule(module_name) for _ in range(100)]
+
+    # Measures the first access of 100 modules per call.
+    def access():
+        for module in modules:
+            module.__file__
+
+    return access
+
+
+def _mock_class_creation(metaclass: type, target_name: str):
+    from google.cloud import storage as gcs
+
+    target = getattr(gcs, target_name)
+
+    def download_to_filename(self, filename, *args, **kwargs):
+        pass
+
+    return lambda: metaclass(
+        f"Mocked{target_name}",
+        (target,),
+        {"__module__": __name__, "download_to_filename": download_to_filename},
+    )
+
+
+@benchmark("testing.MockMeta.class_creation", params=["Client", "Bucket", "Blob"])
+def bench_mock_meta(target_name):
+    return _mock_class_creation(MockMeta, target_name)
+
+
+@benchmark("testing.LazyMockMeta.class_creation", params=["Client", "Bucket", "Blob"])
+def bench_lazy_mock_meta(target_name):
+    return _mock_class_creation(LazyMockMeta, target_name)
+
+
+# The 100k file runs take a while, so only do them when explicitly asked for.
+NUM_FILES = [1000]
+if os.getenv("PRACTIPY_BENCHMARK_LARGE"):
+    NUM_FILES.append(100_000)
+
+FILE_SIZE = 1024
+
+# Worker processes only use the fake storage if they are forked from this process. They
+# need shared storage, which adds a round trip to its manager process to every request,
+# so those runs measure the overhead of the fake as much as that of practipy.
+PROCESSES = [1]
+if multiprocessing.get_start_method() == "fork":
+    PROCESSES.append(4)
+
+_transfer_dir = tempfile.TemporaryDirectory(prefix="practipy_benchmark_gcloud")
+
+
+@functools.lru_cache(maxsize=None)
+def _remote_storage(num_files: int, shared: bool):
+    from practipy.gcloud_testing import FakeStorage
+
+    storage = FakeStorage(shared=shared)
+    storage.add_blobs(
+        "bucket",
+        {f"source/{i}.bin": os.urandom(FILE_SIZE) for i in range(num_files)},
+    )
+    return storage
+
+
+@functools.lru_cache(maxsize=None)
+def _local_folder(num_files: int) -> Path:
+    folder = Path(_transfer_dir.name) / f"source_{num_files}"
+    folder.mkdir()
+    for i in range(num_files):
+        (folder / f"{i}.bin").write_bytes(os.urandom(FILE_SIZE))
+    return folder
+
+
+def _empty_folder(name: str) -> Path:
+    folder = Path(_transfer_dir.name) / name
+    shutil.rmtree(folder, ignore_errors=True)
+    folder.mkdir()
+    return folder
+
+
+def _transfer(storage, func, *args, **kwargs):
+    from practipy.gcloud_testing import fake_gcs
+
+    def transfer():
+        with fake_gcs(storage):
+            func("project", *args, progress_bar=False, **kwargs)
+
+    return transfer
+
+
+def _bench_download_files(num_files, processes):
+    storage = _remote_storage(num_files, processes > 1)
+    names = [f"source/{i}.bin" for i in range(num_files)]
+    target = _empty_folder("download_files")
+    return _transfer(
+        storage, gcloud.download_files, "bucket", names, target, processes=processes
+    )
+
+
+def _bench_upload_folder(num_files, processes):
+    storage = _remote_storage(num_files, processes > 1)
+    source = _local_folder(num_files)
+    return _transfer(
+        storage, gcloud.upload_folder, source, "gs://bucket/target", processes=processes
+    )
+
+
+@benchmark("gcloud.download_files", params=NUM_FILES, number=1)
+def bench_download_files(num_files):
+    return _bench_download_files(num_files, processes=1)
+
+
+@benchmark("gcloud.download_folder", params=NUM_FILES, number=1)
+def bench_download_folder(num_files):
+    storage = _remote_storage(num_files, False)
+    target = _empty_folder("download_folder")
+    return _transfer(storage, gcloud.download_folder, "gs://bucket/source", target)
+
+
+@benchmark("gcloud.upload_folder", params=NUM_FILES, number=1)
+def bench_upload_folder(num_files):
+    return _bench_upload_folder(num_files, processes=1)
+
+
+if 4 in PROCESSES:
+
+    @benchmark("gcloud.download_files.4_processes", params=NUM_FILES, number=1)
+    def bench_download_files_processes(num_files):
+        return _bench_download_files(num_files, processes=4)
+
+    @benchmark("gcloud.upload_folder.4_processes", params=NUM_FILES, number=1)
+    def bench_upload_folder_processes(num_files):
+        return _bench_upload_folder(num_files, processes=4)
+
+
+@benchmark("gcloud.network_futures_progress_bar", params=NUM_FILES)
+def bench_network_futures_progress_bar(num_files):
+    futures = []
+    for i in range(num_files):
+        future = Future()
+        future.set_result(gcloud.TransferEvent(FILE_SIZE, str(i), str(i)))
+        futures.append(future)
+
+    def progress_bar():
+        # The progress bar is still rendered, just not to the terminal.
+        with contextlib.redirect_stderr(io.StringIO()):
+            gcloud.network_futures_progress_bar(futures, keep_order=False)
+
+    return progress_bar
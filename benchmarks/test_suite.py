@@ -0,0 +1,86 @@
+import random
+
+import pytest
+
+import benchmarks.suite  # noqa: F401 Registers the benchmarks.
+from benchmarks.__main__ import main
+from benchmarks.harness import (
+    BENCHMARKS,
+    Result,
+    compare,
+    git_commit,
+    load_results,
+    mann_whitney_p_value,
+    run_benchmark,
+    save_results,
+)
+
+
+@pytest.mark.parametrize("name", sorted(BENCHMARKS))
+def test_benchmark_runs(name):
+    bench = BENCHMARKS[name]
+    result = run_benchmark(bench, bench.params[0], repeat=2, min_sample_time=0.001)
+    assert len(result.samples) == 2
+    assert all(sample > 0 for sample in result.samples)
+
+
+def _samples(mean, n=20, seed=0):
+    rng = random.Random(seed)
+    return [rng.gauss(mean, mean * 0.02) for _ in range(n)]
+
+
+def test_mann_whitney_p_value():
+    assert mann_whitney_p_value(_samples(1.0), _samples(1.0, seed=1)) > 0.05
+    assert mann_whitney_p_value(_samples(1.0), _samples(1.2, seed=1)) < 0.001
+    assert mann_whitney_p_value([1.0] * 5, [1.0] * 5) == 1.0
+
+
+def test_compare():
+    baseline = {
+        ("a", "1"): Result("a", "1", _samples(1.0)),
+        ("b", "1"): Result("b", "1", _samples(1.0)),
+        ("c", "1"): Result("c", "1", _samples(1.0)),
+    }
+    contender = {
+        # Significantly slower.
+        ("a", "1"): Result("a", "1", _samples(1.5, seed=1)),
+        # Just noise.
+        ("b", "1"): Result("b", "1", _samples(1.0, seed=1)),
+        # Faster.
+        ("c", "1"): Result("c", "1", _samples(0.5, seed=1)),
+        # Only in the contender.
+        ("d", "1"): Result("d", "1", _samples(1.0, seed=1)),
+    }
+    comparisons = compare(baseline, contender)
+    assert [(c.benchmark, c.regression) for c in comparisons] == [
+        ("a", True),
+        ("b", False),
+        ("c", False),
+    ]
+
+
+def test_history(tmp_path, capsys):
+    history = tmp_path / "history.jsonl"
+    commit = git_commit()
+    save_results([Result("a", "1", _samples(1.0))], commit, history)
+    save_results([Result("a", "1", _samples(2.0))], commit, history)
+
+    # The most recent run is used.
+    assert load_results(commit, history)[("a", "1")].median > 1.5
+    with pytest.raises(ValueError):
+        load_results("0" * 40, history)
+
+    assert main(["compare", "HEAD", "HEAD", "--history", str(history)]) == 0
+    assert "0 of 1 benchmarks regressed." in capsys.readouterr().out
+
+
+def test_quick_run(tmp_path, capsys):
+    history = tmp_path / "history.jsonl"
+    args = ["run", "--quick", "--repeat", "1", "--history", str(history)]
+    assert main(args + ["--benchmarks", "typing.typed", "iterators.batch"]) == 0
+
+    output = capsys.readouterr().out
+    assert "typing.typed[untyped]" in output
+    assert "iterators.batch[10]:" in output
+    assert "iterators.batch[1000]" not in output
+    assert not history.exists()
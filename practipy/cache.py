@@ -1,12 +1,43 @@
+import functools
 import sys
 from pathlib import Path
 
-from diskcache import Cache
+from practipy.imports import lazy_import
+
+diskcache = lazy_import("diskcache")
 
 if sys.platform in ["win32", "cygwin"]:
-    _cache = Cache(Path.home() / "AppData" / "Local" / "Temp" / "practipy_cache")
+    _cache_dir = Path.home() / "AppData" / "Local" / "Temp" / "practipy_cache"
 else:
-    _cache = Cache("/tmp/practipy_cache")
+    _cache_dir = Path("/tmp/practipy_cache")
+
+
+@functools.lru_cache(maxsize=1)
+def _get_cache():
+    """Opens the disk cache the first time it is needed, rather than at import."""
+    return diskcache.Cache(_cache_dir)
+
+
+def _memoize(func, *args, **kwargs):
+    memoized = None
+
+    def get_memoized():
+        nonlocal memoized
+        # Only touch the cache once the decorated function is actually used.
+        if memoized is None:
+            memoized = _get_cache().memoize(*args, **kwargs)(func)
+        return memoized
+
+    @functools.wraps(func)
+    def wrapper(*func_args, **func_kwargs):
+        return get_memoized()(*func_args, **func_kwargs)
+
+    def __cache_key__(*func_args, **func_kwargs):
+        """Make key for cache given function arguments, like diskcache does."""
+        return get_memoized().__cache_key__(*func_args, **func_kwargs)
+
+    wrapper.__cache_key__ = __cache_key__
+    return wrapper
 
 
 def cache_disk(*args, **kwargs):
@@ -16,9 +47,9 @@ def cache_disk(*args, **kwargs):
     calls.
     """
     if len(args) == 1 and callable(args[0]):
-        return _cache.memoize()(args[0])
+        return _memoize(args[0])
 
     def wrapped(func):
-        return _cache.memoize(*args, **kwargs)(func)
+        return _memoize(func, *args, **kwargs)
 
     return wrapped
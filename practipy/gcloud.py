@@ -1,17 +1,19 @@
 import functools
 import math
 import os
-from concurrent.futures import Future, ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed, wait
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List, Literal, Sequence, Union
-
-from google.auth.exceptions import DefaultCredentialsError, RefreshError
-from google.cloud import storage as gcs
-from tqdm import tqdm
+from typing import Callable, List, Literal, Optional, Sequence, Tuple, Union
 
+from practipy.imports import lazy_import
 from practipy.text import remove_prefix
 
+# These are heavy to import, so only do so once they are actually used.
+auth_exceptions = lazy_import("google.auth.exceptions")
+gcs = lazy_import("google.cloud.storage")
+tqdm = lazy_import("tqdm")
+
 """
 TODO:
 - Return generator instead of list?
@@ -40,22 +42,150 @@ def catch_unauthenticated(f):
         try:
             return f(*args, **kwargs)
         # Detect when exception stems from not being authenticated
-        except (RefreshError, DefaultCredentialsError) as e:
+        except (
+            auth_exceptions.RefreshError,
+            auth_exceptions.DefaultCredentialsError,
+        ) as e:
             _raise_error(e)
 
     return wrapper
 
 
+def _download_blob(bucket: "gcs.Bucket", item: Tuple[str, str]) -> TransferEvent:
+    """Download blob `item[0]` to local path `item[1]`, unless it already exists."""
+    blob_name, local_path = item
+    local_path = Path(local_path)
+
+    num_bytes = 0
+    # If this is an empty folder, just create it, don't download it.
+    if blob_name.endswith("/"):
+        local_path.mkdir(exist_ok=True, parents=True)
+    # Otherwise, make sure the folder for this file exists and download the file.
+    elif not local_path.exists():
+        local_path.parent.mkdir(exist_ok=True, parents=True)
+        bucket.blob(blob_name).download_to_filename(str(local_path))
+        # blob.size is unreliable and may return None for some reason...
+        num_bytes = local_path.stat().st_size
+
+    return TransferEvent(num_bytes, blob_name, str(local_path))
+
+
+def _upload_file(bucket: "gcs.Bucket", item: Tuple[str, str]) -> TransferEvent:
+    """Upload local file `item[0]` to blob `item[1]`."""
+    local_path, blob_name = item
+    # Note: This will overwrite any blobs that already exist.
+    blob = bucket.blob(blob_name)
+    blob.upload_from_filename(local_path, checksum="md5")
+    return TransferEvent(os.stat(local_path).st_size, local_path, blob.name)
+
+
+# Every transfer process has its own client and thread pool, which are created by the
+# first chunk it transfers. Doing so in the task rather than in the process initializer
+# means that e.g. authentication errors are passed back to the caller instead of
+# breaking the process pool.
+_process_settings: Optional[Tuple[str, str]] = None
+_process_bucket: Optional["gcs.Bucket"] = None
+_process_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _init_transfer_process(project: str, bucket_name: str):
+    global _process_settings
+    _process_settings = (project, bucket_name)
+
+
+def _transfer_chunk(
+    transfer: Callable[["gcs.Bucket", Tuple[str, str]], TransferEvent],
+    chunk: List[Tuple[str, str]],
+) -> List[Tuple[Optional[TransferEvent], Optional[BaseException]]]:
+    """Transfer all items in `chunk` and return the event or exception of each."""
+    global _process_bucket, _process_executor
+    if _process_bucket is None:
+        project, bucket_name = _process_settings
+        _process_bucket = gcs.Client(project=project).bucket(bucket_name)
+        _process_executor = ThreadPoolExecutor()
+
+    futures = [_process_executor.submit(transfer, _process_bucket, i) for i in chunk]
+    wait(futures)
+    return [
+        (None, f.exception()) if f.exception() else (f.result(), None) for f in futures
+    ]
+
+
+def _resolve_futures(futures: List[Future], chunk_future: Future):
+    """Distribute the results of a finished chunk over the futures of its files."""
+    try:
+        results = chunk_future.result()
+    # If the chunk as a whole failed, so did all of its files.
+    except BaseException as e:
+        for future in futures:
+            future.set_exception(e)
+        return
+
+    for future, (event, exception) in zip(futures, results):
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(event)
+
+
+def _submit_transfers(
+    project: str,
+    bucket_name: str,
+    transfer: Callable[["gcs.Bucket", Tuple[str, str]], TransferEvent],
+    items: List[Tuple[str, str]],
+    processes: int,
+    chunksize: int,
+) -> Tuple[Executor, List[Future]]:
+    """Start calling `transfer` on all `items` in parallel and return the executor and
+    a future for every item.
+
+    With a single process, a ThreadPool is used. Otherwise the items are split into
+    chunks of `chunksize` that are divided over `processes` processes, which each
+    transfer their chunks using their own ThreadPool. This avoids being limited by the
+    GIL when transferring many small files.
+    """
+    if processes <= 1:
+        bucket = gcs.Client(project=project).bucket(bucket_name)
+        executor = ThreadPoolExecutor()
+        futures = [executor.submit(transfer, bucket, item) for item in items]
+        return executor, futures
+
+    # This imports all of multiprocessing, so only do so when it is actually needed.
+    from concurrent.futures import ProcessPoolExecutor
+
+    executor = ProcessPoolExecutor(
+        processes,
+        initializer=_init_transfer_process,
+        initargs=(project, bucket_name),
+    )
+    # These are resolved once the chunk they are part of has been transferred, so that
+    # they can be reported on like the futures of individual files.
+    futures = [Future() for _ in items]
+    for start in range(0, len(items), chunksize):
+        chunk_future = executor.submit(
+            _transfer_chunk, transfer, items[start : start + chunksize]
+        )
+        chunk_future.add_done_callback(
+            functools.partial(_resolve_futures, futures[start : start + chunksize])
+        )
+    return executor, futures
+
+
 @catch_unauthenticated
 def download_folder(
     project: str,
     source_dir: str,
     target_dir: Union[Path, str],
     progress_bar: bool = True,
+    processes: int = 1,
+    chunksize: int = 1000,
 ):
     """Download all the contents of `source_dir` on GCS `target_dir` on the local
     filesystem.
 
+    If `processes` is larger than 1, the files are downloaded by that many processes in
+    chunks of `chunksize` files, which is faster for many small files.
+
     Note: The bucket should be included in the source path!
     """
     target_dir = Path(target_dir)
@@ -66,29 +196,17 @@ def download_folder(
     source_dir = str(source_dir.relative_to(bucket_name))
     client = gcs.Client(project=project)
 
-    def download_blob(blob: gcs.Blob) -> TransferEvent:
-        relative_path = remove_prefix(blob.name, source_dir)
-        local_path = target_dir.joinpath(relative_path.strip("/"))
-
-        num_bytes = 0
-        # If this is an empty folder, just create it, don't download it.
-        if relative_path.endswith("/"):
-            local_path.mkdir(exist_ok=True)
-        # Otherwise, make sure the folder for this file exists and download the file.
-        elif not local_path.exists():
-            local_path.parent.mkdir(exist_ok=True, parents=True)
-            blob.download_to_filename(str(local_path))
-            # blob.size is unreliable and may return None for some reason...
-            num_bytes = local_path.stat().st_size
-
-        return TransferEvent(num_bytes, blob.name, str(local_path))
-
     # We simply download all blobs that are prefixed with the source dir
-    blobs = list(client.list_blobs(bucket_name, prefix=source_dir))
+    items = []
+    for blob in client.list_blobs(bucket_name, prefix=source_dir):
+        relative_path = remove_prefix(blob.name, source_dir)
+        items.append((blob.name, str(target_dir.joinpath(relative_path.strip("/")))))
 
-    # Create a ThreadPool to download multiple files in parallel
-    with ThreadPoolExecutor() as e:
-        futures = [e.submit(download_blob, blob) for blob in blobs]
+    # Download multiple files in parallel
+    executor, futures = _submit_transfers(
+        project, bucket_name, _download_blob, items, processes, chunksize
+    )
+    with executor:
         if progress_bar:
             network_futures_progress_bar(futures, mode="download", keep_order=False)
         else:
@@ -104,33 +222,29 @@ def download_files(
     strip_prefix: str = "",
     keep_order: bool = True,
     progress_bar: bool = True,
+    processes: int = 1,
+    chunksize: int = 1000,
 ) -> List[str]:
     """Strips `strip_prefix` from all GCS paths in `gcs_paths` and then downloads them
     to `download_dir` on the local filesystem, creating it if it does not yet exist.
 
+    If `processes` is larger than 1, the files are downloaded by that many processes in
+    chunks of `chunksize` files, which is faster for many small files.
+
     Returns the list of local filepaths.
     Note: paths are relative to `gs://<bucket_name>`!.
     """
-
-    bucket = gcs.Client(project=project).bucket(bucket_name)
-    blobs = [bucket.blob(gcs_path) for gcs_path in gcs_paths]
     download_dir = Path(download_dir)
-
-    def download_blob(blob: gcs.Blob) -> TransferEvent:
-        relative_path = remove_prefix(blob.name, strip_prefix)
-        local_path = download_dir.joinpath(relative_path)
-        num_bytes = 0
-        if not local_path.exists():
-            local_path.parent.mkdir(exist_ok=True, parents=True)
-            blob.download_to_filename(str(local_path))
-            # blob.size is unreliable and may return None for some reason...
-            num_bytes = local_path.stat().st_size
-
-        return TransferEvent(num_bytes, blob.name, str(local_path))
-
-    # Create a ThreadPool to download multiple files in parallel
-    with ThreadPoolExecutor() as e:
-        futures = [e.submit(download_blob, blob) for blob in blobs]
+    items = [
+        (gcs_path, str(download_dir.joinpath(remove_prefix(gcs_path, strip_prefix))))
+        for gcs_path in gcs_paths
+    ]
+
+    # Download multiple files in parallel
+    executor, futures = _submit_transfers(
+        project, bucket_name, _download_blob, items, processes, chunksize
+    )
+    with executor:
         if progress_bar:
             events = network_futures_progress_bar(futures, keep_order=keep_order)
         else:
@@ -175,10 +289,15 @@ def upload_folder(
     source_dir: Union[Path, str],
     target_dir: str,
     progress_bar: bool = True,
+    processes: int = 1,
+    chunksize: int = 1000,
 ) -> None:
     """Upload all the contents of `source_dir` on the local filesystem into `target_dir`
     on GCS.
 
+    If `processes` is larger than 1, the files are uploaded by that many processes in
+    chunks of `chunksize` files, which is faster for many small files.
+
     Note: The bucket should be included in the target path!
     """
 
@@ -189,18 +308,17 @@ def upload_folder(
     bucket_name = target_dir.parts[0]
     target_dir = str(target_dir.relative_to(bucket_name))
 
-    bucket = gcs.Client(project=project).bucket(str(bucket_name))
+    items = [
+        (str(file), os.path.join(target_dir, str(file.relative_to(source_dir))))
+        for file in source_dir.glob("**/*")
+        if file.is_file()
+    ]
 
-    # Note: This will overwrite any blobs that already exist.
-    def upload_file(file: Path) -> TransferEvent:
-        blob = bucket.blob(os.path.join(target_dir, str(file.relative_to(source_dir))))
-        blob.upload_from_filename(str(file), checksum="md5")
-        return TransferEvent(file.stat().st_size, str(file), blob.name)
-
-    files = source_dir.glob("**/*")
-    # Create a ThreadPool to upload multiple files in parallel
-    with ThreadPoolExecutor() as e:
-        futures = [e.submit(upload_file, file) for file in files if file.is_file()]
+    # Upload multiple files in parallel
+    executor, futures = _submit_transfers(
+        project, str(bucket_name), _upload_file, items, processes, chunksize
+    )
+    with executor:
         if progress_bar:
             network_futures_progress_bar(futures, mode="upload", keep_order=False)
         else:
@@ -214,11 +332,16 @@ def upload_files(
     target_dir: str,
     strip_prefix: str = "",
     progress_bar: bool = True,
+    processes: int = 1,
+    chunksize: int = 1000,
 ) -> None:
     """Upload all provided files from the local filesystem into `target_dir` on GCS.
     `strip_prefix` is removed from each local filepath and the remainder is appended to
     `target_dir` to create the target path.
 
+    If `processes` is larger than 1, the files are uploaded by that many processes in
+    chunks of `chunksize` files, which is faster for many small files.
+
     Note: The bucket should be included in the target path!
     """
 
@@ -227,19 +350,19 @@ def upload_files(
     bucket_name = target_dir.parts[0]
     target_dir = str(target_dir.relative_to(bucket_name))
 
-    bucket = gcs.Client(project=project).bucket(str(bucket_name))
-
-    # Note: This will overwrite any blobs that already exist.
-    def upload_file(file: Path) -> TransferEvent:
-        blob = bucket.blob(
-            os.path.join(target_dir, remove_prefix(str(file), strip_prefix).strip("/"))
+    items = [
+        (
+            str(path),
+            os.path.join(target_dir, remove_prefix(str(path), strip_prefix).strip("/")),
         )
-        blob.upload_from_filename(str(file), checksum="md5")
-        return TransferEvent(file.stat().st_size, str(file), blob.name)
+        for path in paths
+    ]
 
-    # Create a ThreadPool to upload multiple files in parallel
-    with ThreadPoolExecutor() as e:
-        futures = [e.submit(upload_file, path) for path in paths]
+    # Upload multiple files in parallel
+    executor, futures = _submit_transfers(
+        project, str(bucket_name), _upload_file, items, processes, chunksize
+    )
+    with executor:
         if progress_bar:
             network_futures_progress_bar(futures, mode="upload", keep_order=False)
         else:
@@ -255,7 +378,7 @@ def network_futures_progress_bar(
     that computes the transfer speed and finally return the list of TransferEvents."""
 
     iterable = futures if keep_order else as_completed(futures)
-    progress_bar = tqdm(
+    progress_bar = tqdm.tqdm(
         iterable, total=len(futures), desc=f"{mode.capitalize()}ing files"
     )
     total_bytes = 0
@@ -0,0 +1,246 @@
+import contextlib
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+import types
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from unittest import mock
+
+from google.cloud import storage as gcs
+
+import practipy.gcloud as gcloud
+from practipy.testing import MockMeta
+
+"""In-memory fake of the parts of `google.cloud.storage` used by `practipy.gcloud`,
+for testing and benchmarking without network access."""
+
+
+class FakeStorage:
+    """Holds the contents of all fake buckets and simulates the network.
+
+    Every request waits `latency` seconds. If `bandwidth` (in bytes per second) is set,
+    all transfers share it, i.e. concurrent transfers slow each other down like they
+    would on a real connection. Errors can be injected for specific blobs with
+    `inject_error`.
+
+    By default everything is kept in the memory of the current process, so it can't be
+    used by the worker processes of e.g. `download_files(..., processes=4)`; they would
+    each modify their own copy. With `shared=True`, the contents are kept in a
+    `multiprocessing.Manager` instead, which makes every request slower but allows
+    forked worker processes to use the storage too.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        bandwidth: Optional[float] = None,
+        shared: bool = False,
+    ):
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.shared = shared
+        self._pid = os.getpid()
+
+        state = {"num_requests": 0, "num_bytes": 0, "bandwidth_free_at": 0.0}
+        if shared:
+            self._manager = multiprocessing.Manager()
+            self._lock = self._manager.Lock()
+            self._blobs = self._manager.dict()
+            self._errors = self._manager.dict()
+            self._state = self._manager.dict(state)
+        else:
+            self._manager = None
+            self._lock = threading.Lock()
+            self._blobs: Dict[Tuple[str, str], bytes] = {}
+            self._errors: Dict[str, List[Exception]] = {}
+            self._state = state
+
+    def close(self):
+        """Shut down the manager process of shared storage."""
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+    @property
+    def buckets(self) -> Dict[str, Dict[str, bytes]]:
+        """A copy of the contents of all buckets, by bucket and blob name."""
+        buckets = defaultdict(dict)
+        for (bucket_name, blob_name), data in self._blobs.items():
+            buckets[bucket_name][blob_name] = data
+        return buckets
+
+    @property
+    def num_requests(self) -> int:
+        return self._state["num_requests"]
+
+    @property
+    def num_bytes(self) -> int:
+        return self._state["num_bytes"]
+
+    def add_blobs(self, bucket_name: str, blobs: Dict[str, bytes]):
+        """Store `blobs`, a mapping of blob name to contents, in the given bucket."""
+        self._blobs.update({(bucket_name, name): data for name, data in blobs.items()})
+
+    def get_blob(self, bucket_name: str, blob_name: str) -> Optional[bytes]:
+        return self._blobs.get((bucket_name, blob_name))
+
+    def put_blob(self, bucket_name: str, blob_name: str, data: bytes):
+        self._check_process()
+        self._blobs[(bucket_name, blob_name)] = data
+
+    def list_blobs(self, bucket_name: str, prefix: str = "") -> List[str]:
+        return sorted(
+            name
+            for bucket, name in self._blobs.keys()
+            if bucket == bucket_name and name.startswith(prefix)
+        )
+
+    def inject_error(self, blob_name: str, error: Exception, times: int = 1):
+        """Raise `error` on the next `times` requests involving `blob_name`."""
+        with self._lock:
+            self._errors[blob_name] = self._errors.get(blob_name, []) + [error] * times
+
+    def _check_process(self):
+        if not self.shared and os.getpid() != self._pid:
+            raise RuntimeError(
+                "This FakeStorage is being used by a worker process, which can't "
+                "modify the storage of the process that created it. Use "
+                "FakeStorage(shared=True) when transferring with processes > 1."
+            )
+
+    def request(self, blob_name: Optional[str] = None, num_bytes: int = 0):
+        """Simulate a single request, optionally transferring `num_bytes` bytes."""
+        self._check_process()
+        with self._lock:
+            self._state["num_requests"] += 1
+            self._state["num_bytes"] += num_bytes
+            errors = self._errors.get(blob_name)
+            error = None
+            if errors:
+                error, self._errors[blob_name] = errors[0], errors[1:]
+
+            delay = self.latency
+            if self.bandwidth is not None and num_bytes > 0:
+                # Reserve a slot on the shared connection and wait until it has passed.
+                now = time.monotonic()
+                start = max(now, self._state["bandwidth_free_at"])
+                self._state["bandwidth_free_at"] = start + num_bytes / self.bandwidth
+                delay += self._state["bandwidth_free_at"] - now
+
+        if delay > 0:
+            time.sleep(delay)
+        if error is not None:
+            raise error
+
+
+class FakeClient(gcs.Client, metaclass=MockMeta):
+    def __init__(self, project: Optional[str] = None, storage: FakeStorage = None):
+        self.project = project
+        self.storage = storage if storage is not None else FakeStorage()
+
+    def bucket(self, bucket_name: str, user_project: Optional[str] = None):
+        return FakeBucket(self, bucket_name)
+
+    def list_blobs(
+        self,
+        bucket_or_name: Union["FakeBucket", str],
+        prefix: Optional[str] = None,
+        **kwargs,
+    ) -> Iterator["FakeBlob"]:
+        if isinstance(bucket_or_name, FakeBucket):
+            bucket = bucket_or_name
+        else:
+            bucket = self.bucket(bucket_or_name)
+
+        self.storage.request()
+        names = self.storage.list_blobs(bucket.name, prefix or "")
+        return iter([FakeBlob(name, bucket) for name in names])
+
+
+class FakeBucket(gcs.Bucket, metaclass=MockMeta):
+    def __init__(self, client: FakeClient, name: str):
+        self._client = client
+        self.name = name
+
+    @property
+    def client(self) -> FakeClient:
+        return self._client
+
+    def blob(self, blob_name: str, *args, **kwargs) -> "FakeBlob":
+        return FakeBlob(blob_name, self)
+
+    def get_blob(self, blob_name: str, *args, **kwargs) -> Optional["FakeBlob"]:
+        self.client.storage.request(blob_name)
+        if self.client.storage.get_blob(self.name, blob_name) is None:
+            return None
+        return FakeBlob(blob_name, self)
+
+    def __repr__(self):
+        return f"<FakeBucket: {self.name}>"
+
+
+class FakeBlob(gcs.Blob, metaclass=MockMeta):
+    def __init__(self, name: str, bucket: FakeBucket, *args, **kwargs):
+        self.name = name
+        self._bucket = bucket
+
+    @property
+    def bucket(self) -> FakeBucket:
+        return self._bucket
+
+    @property
+    def client(self) -> FakeClient:
+        return self._bucket.client
+
+    @property
+    def size(self) -> Optional[int]:
+        data = self.client.storage.get_blob(self._bucket.name, self.name)
+        return None if data is None else len(data)
+
+    def download_to_filename(self, filename: str, *args, **kwargs):
+        data = self.client.storage.get_blob(self._bucket.name, self.name)
+        self.client.storage.request(self.name, len(data or b""))
+        if data is None:
+            raise FileNotFoundError(f"gs://{self._bucket.name}/{self.name}")
+        Path(filename).write_bytes(data)
+
+    def upload_from_filename(
+        self, filename: str, *args, checksum: Optional[str] = None, **kwargs
+    ):
+        data = Path(filename).read_bytes()
+        # Do the same work the real client does to validate the upload.
+        if checksum == "md5":
+            hashlib.md5(data).digest()
+        self.client.storage.request(self.name, len(data))
+        self.client.storage.put_blob(self._bucket.name, self.name, data)
+
+    def __repr__(self):
+        return f"<FakeBlob: {self._bucket.name}, {self.name}>"
+
+
+@contextlib.contextmanager
+def fake_gcs(storage: Optional[FakeStorage] = None) -> Iterator[FakeStorage]:
+    """Make all functions in `practipy.gcloud` use an in-memory `FakeStorage` instead of
+    Google Cloud Storage.
+
+    Example usage:
+    ```python
+        with fake_gcs(FakeStorage(latency=0.01)) as storage:
+            storage.add_blobs("bucket", {"folder/file.txt": b"contents"})
+            download_folder("project", "gs://bucket/folder", "/tmp/folder")
+    ```
+    """
+    storage = storage if storage is not None else FakeStorage()
+
+    def client(project: Optional[str] = None, *args, **kwargs) -> FakeClient:
+        return FakeClient(project, storage=storage)
+
+    fake_module = types.SimpleNamespace(
+        Client=client, Bucket=FakeBucket, Blob=FakeBlob
+    )
+    with mock.patch.object(gcloud, "gcs", fake_module):
+        yield storage
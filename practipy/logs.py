@@ -1,14 +1,125 @@
+import itertools
 import logging
-from typing import IO, Optional
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import IO, Dict, List, Literal, Optional, Tuple
+
+# Put on the queue to tell the listener thread that no more records will follow.
+_STOP = object()
+
+
+@dataclass
+class RedirectStats:
+    """Counts of what happened to the records captured by `redirect_logs`."""
+
+    enqueued: int = 0
+    written: int = 0
+    dropped: int = 0
+    deduplicated: int = 0
+    rate_limited: int = 0
+    batches: int = 0
+
+
+class _TokenBucket:
+    """Allows on average `rate` records per second, with bursts of up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: int, now: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.last_update = now
+        # Number of records suppressed since the last one that was let through.
+        self.suppressed = 0
+        self.last_suppressed: Optional[logging.LogRecord] = None
+
+    def consume(self, now: float) -> bool:
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.last_update) * self.rate
+        )
+        self.last_update = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+@dataclass
+class _Repeats:
+    """Tracks how often a message template was repeated since `window_start`."""
+
+    window_start: float
+    count: int = 0
+    last_record: Optional[logging.LogRecord] = None
+
+
+def _summary_record(record: logging.LogRecord, msg: str, args: tuple):
+    """Returns a copy of `record` with its message replaced."""
+    return logging.makeLogRecord(
+        {
+            **record.__dict__,
+            "msg": msg,
+            "args": args,
+            "exc_info": None,
+            "exc_text": None,
+            "stack_info": None,
+        }
+    )
 
 
 class redirect_logs:
+    """Context manager that captures all records handled by `logger` and writes them to
+    `file`, formatted by `handler`, instead of passing them on to the logger's handlers.
+
+    By default every record is formatted and written on the thread that logged it. With
+    `asynchronous=True`, records are instead put on a queue of at most `queue_size`
+    records, and a listener thread formats them and writes them to `file` in batches of
+    up to `batch_size` records. The arguments of each record are merged into its message
+    before it is queued, so later changes to them don't affect what is written. All
+    queued records are written when the context exits.
+
+    `overflow` determines what happens when the queue is full:
+    - "block": wait until the listener thread has made room.
+    - "drop": discard the record.
+    - "sample": keep one out of every `sample_every` overflowing records (waiting for
+      room like "block") and discard the others.
+
+    To deal with very chatty loggers, records can be suppressed before they are
+    formatted or queued:
+    - With `deduplicate=True`, a message that was already logged by the same logger with
+      the same template less than `summary_interval` seconds ago is suppressed. Once the
+      interval has passed (or the context exits), a summary with the number of
+      suppressed repeats is written instead.
+    - With `rate_limit` set, each logger may write on average `rate_limit` records per
+      second, in bursts of up to `burst` records. The number of records that were
+      suppressed is written the next time the logger is allowed to write again.
+
+    The number of enqueued, written, dropped and suppressed records is available from
+    `stats`.
+    """
+
     def __init__(
         self,
         logger: Optional[logging.Logger] = None,
         handler: Optional[logging.Handler] = None,
         file: Optional[IO] = None,
+        asynchronous: bool = False,
+        queue_size: int = 10000,
+        batch_size: int = 1000,
+        overflow: Literal["block", "drop", "sample"] = "block",
+        sample_every: int = 100,
+        deduplicate: bool = False,
+        summary_interval: float = 10.0,
+        rate_limit: Optional[float] = None,
+        burst: int = 10,
     ):
+        if overflow not in ("block", "drop", "sample"):
+            raise ValueError(
+                f"Unknown overflow policy '{overflow}', "
+                "expected 'block', 'drop' or 'sample'."
+            )
+
         # Either use the specfied logger or use the default python logger
         self.logger = logger or logging.root
 
@@ -24,16 +135,262 @@ class redirect_logs:
                 self.handler = logging.lastResort
 
         self.file = file
+        self.asynchronous = asynchronous
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.overflow = overflow
+        self.sample_every = sample_every
+        self.deduplicate = deduplicate
+        self.summary_interval = summary_interval
+        self.rate_limit = rate_limit
+        self.burst = burst
+        self.stats = RedirectStats()
+
+        self._write_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._queue: Optional[queue.Queue] = None
+        self._listener: Optional[threading.Thread] = None
+        self._overflow_counter = itertools.count()
+        self._suppress_lock = threading.Lock()
+        self._repeats: Dict[Tuple[str, str], _Repeats] = {}
+        self._last_sweep = time.monotonic()
+        self._buckets: Dict[str, _TokenBucket] = {}
+
+    def _accepts(self, record: logging.LogRecord) -> bool:
+        # Apply the same filtering the logger and handler would normally have done.
+        return (
+            not self.logger.disabled
+            and record.levelno >= self.handler.level
+            and bool(self.logger.filter(record))
+        )
+
+    def _deduplicate(
+        self, record: logging.LogRecord, now: float, summaries: List[logging.LogRecord]
+    ) -> bool:
+        # Messages that are formatted before logging (e.g. f-strings) all have different
+        # templates, so regularly forget those that are no longer being repeated.
+        if now - self._last_sweep >= self.summary_interval:
+            self._sweep_repeats(now, summaries)
+
+        key = (record.name, str(record.msg))
+        repeats = self._repeats.get(key)
+        if repeats is not None and now - repeats.window_start < self.summary_interval:
+            repeats.count += 1
+            repeats.last_record = record
+            return False
+
+        if repeats is not None and repeats.count > 0:
+            summaries.append(self._repeats_summary(repeats, now))
+        self._repeats[key] = _Repeats(window_start=now)
+        return True
+
+    def _sweep_repeats(self, now: float, summaries: List[logging.LogRecord]):
+        """Remove all templates whose interval has passed, adding a summary for those
+        that were repeated."""
+        for key, repeats in list(self._repeats.items()):
+            if now - repeats.window_start >= self.summary_interval:
+                if repeats.count > 0:
+                    summaries.append(self._repeats_summary(repeats, now))
+                del self._repeats[key]
+        self._last_sweep = now
+
+    def _repeats_summary(self, repeats: _Repeats, now: float) -> logging.LogRecord:
+        return _summary_record(
+            repeats.last_record,
+            "Suppressed %d repeats of '%s' in the last %.1f s.",
+            (repeats.count, repeats.last_record.msg, now - repeats.window_start),
+        )
+
+    def _rate_limit(
+        self, record: logging.LogRecord, now: float, summaries: List[logging.LogRecord]
+    ) -> bool:
+        bucket = self._buckets.get(record.name)
+        if bucket is None:
+            bucket = self._buckets[record.name] = _TokenBucket(
+                self.rate_limit, self.burst, now
+            )
+
+        if not bucket.consume(now):
+            bucket.suppressed += 1
+            bucket.last_suppressed = record
+            return False
+
+        if bucket.suppressed > 0:
+            summaries.append(self._bucket_summary(bucket))
+            bucket.suppressed = 0
+        return True
+
+    def _bucket_summary(self, bucket: _TokenBucket) -> logging.LogRecord:
+        return _summary_record(
+            bucket.last_suppressed,
+            "Rate limited %d records from logger %s.",
+            (bucket.suppressed, bucket.last_suppressed.name),
+        )
+
+    def _throttle(self, record: logging.LogRecord) -> List[logging.LogRecord]:
+        """Returns the records that should be written in response to `record`: any
+        pending summaries, followed by `record` itself unless it is suppressed."""
+        if not self.deduplicate and self.rate_limit is None:
+            return [record]
+
+        summaries: List[logging.LogRecord] = []
+        now = time.monotonic()
+        with self._suppress_lock:
+            if self.deduplicate and not self._deduplicate(record, now, summaries):
+                with self._stats_lock:
+                    self.stats.deduplicated += 1
+                return summaries
+            if self.rate_limit is not None and not self._rate_limit(
+                record, now, summaries
+            ):
+                with self._stats_lock:
+                    self.stats.rate_limited += 1
+                return summaries
+
+        return summaries + [record]
+
+    def _pending_summaries(self) -> List[logging.LogRecord]:
+        now = time.monotonic()
+        with self._suppress_lock:
+            summaries = [
+                self._repeats_summary(repeats, now)
+                for repeats in self._repeats.values()
+                if repeats.count > 0
+            ]
+            summaries += [
+                self._bucket_summary(bucket)
+                for bucket in self._buckets.values()
+                if bucket.suppressed > 0
+            ]
+            self._repeats.clear()
+            self._buckets.clear()
+        return summaries
+
+    def _format(self, record: logging.LogRecord) -> str:
+        terminator = getattr(self.handler, "terminator", "\n")
+        return self.handler.format(record) + terminator
+
+    def _write(self, records: List[logging.LogRecord]):
+        # Errors are reported like logging.Handler.emit does, so that a failing file
+        # can't kill the listener thread and leave the queue without a consumer.
+        lines = []
+        for record in records:
+            try:
+                lines.append(self._format(record))
+            except Exception:
+                self.handler.handleError(record)
+        if not lines:
+            return
+
+        try:
+            with self._write_lock:
+                self.file.write("".join(lines))
+        except Exception:
+            self.handler.handleError(records[-1])
+            return
+
+        with self._stats_lock:
+            self.stats.written += len(lines)
+            self.stats.batches += 1
+
+    def _handle_sync(self, record: logging.LogRecord):
+        # Format the log like it normally would be and write it to the redirect file.
+        if self.file and self._accepts(record):
+            records = self._throttle(record)
+            if records:
+                self._write(records)
+
+    def _prepare(self, record: logging.LogRecord):
+        """Merge the arguments into the message and render the traceback, like
+        `logging.handlers.QueueHandler.prepare` does, so that the record is written as
+        it was at the time of logging even if its arguments are changed afterwards."""
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                formatter = self.handler.formatter or logging.Formatter()
+                record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+
+    def _handle_async(self, record: logging.LogRecord):
+        if self._accepts(record):
+            # Deduplication needs the original template, so only prepare afterwards.
+            for item in self._throttle(record):
+                try:
+                    self._prepare(item)
+                except Exception:
+                    self.handler.handleError(item)
+                    continue
+                self._enqueue(item)
+
+    def _enqueue(self, record: logging.LogRecord):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            if self.overflow == "drop" or (
+                self.overflow == "sample"
+                and (next(self._overflow_counter) + 1) % self.sample_every != 0
+            ):
+                with self._stats_lock:
+                    self.stats.dropped += 1
+                return
+            self._queue.put(record)
+
+        with self._stats_lock:
+            self.stats.enqueued += 1
+
+    def _listen(self):
+        stopped = False
+        while not stopped:
+            records = []
+            item = self._queue.get()
+            # Drain whatever else is already waiting so it can be written at once.
+            while True:
+                if item is _STOP:
+                    stopped = True
+                    break
+                records.append(item)
+                if len(records) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            if records:
+                self._write(records)
 
     def __enter__(self, *args, **kwargs):
         self._original_handle_func = self.logger.handle
 
-        def redirect_handle(record):
-            # Format the log like it normally would be and write it to the redirect file.
-            if self.file:
-                self.file.write(self.handler.format(record))
+        if self.asynchronous and self.file:
+            self._queue = queue.Queue(maxsize=self.queue_size)
+            self._listener = threading.Thread(
+                target=self._listen, name="practipy-redirect-logs", daemon=True
+            )
+            self._listener.start()
+            self.logger.handle = self._handle_async
+        else:
+            self.logger.handle = self._handle_sync
 
-        self.logger.handle = redirect_handle
+        return self
 
     def __exit__(self, *args, **kwargs):
         self.logger.handle = self._original_handle_func
+
+        summaries = self._pending_summaries() if self.file else []
+        if self._listener is not None:
+            for summary in summaries:
+                self._enqueue(summary)
+        elif summaries:
+            self._write(summaries)
+
+        # Write everything that is still queued before returning.
+        if self._listener is not None:
+            self._queue.put(_STOP)
+            self._listener.join()
+            self._listener = None
+            self._queue = None
+
+        if self.file and hasattr(self.file, "flush"):
+            self.file.flush()
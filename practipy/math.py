@@ -1,4 +1,6 @@
-import numpy as np
+from practipy.imports import lazy_import
+
+np = lazy_import("numpy")
 
 
 def sigmoid(x):
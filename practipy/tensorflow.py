@@ -2,15 +2,19 @@ from contextlib import contextmanager
 from typing import IO, Optional
 
 import practipy.logs as logs
+from practipy.imports import lazy_import
 
+absl_logging = lazy_import("absl.logging")
 
-@contextmanager
-def redirect_logs(file: Optional[IO] = None):
-    import absl
 
+@contextmanager
+def redirect_logs(file: Optional[IO] = None, **kwargs):
+    """Redirect absl logs to `file`. Any other keyword arguments (e.g.
+    `asynchronous=True`) are passed on to `practipy.logs.redirect_logs`."""
     with logs.redirect_logs(
-        logger=absl.logging.get_absl_logger(),
-        handler=absl.logging.get_absl_handler(),
+        logger=absl_logging.get_absl_logger(),
+        handler=absl_logging.get_absl_handler(),
         file=file,
-    ):
-        yield
+        **kwargs,
+    ) as redirect:
+        yield redirect
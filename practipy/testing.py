@@ -1,6 +1,7 @@
 import functools
 import inspect
 from types import new_class
+from typing import Iterable, Tuple
 
 
 class _NotImplementedDescriptor:
@@ -20,9 +21,61 @@ class _NotImplementedDescriptor:
 
 
 @functools.lru_cache(maxsize=1)
-def _get_default_attributes() -> set:
+def _get_default_attributes() -> frozenset:
     """Returns the attributes that are defined on any class."""
-    return set(dir(new_class("Stub")))
+    return frozenset(dir(new_class("Stub")))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_descriptor(name: str) -> _NotImplementedDescriptor:
+    """Returns the descriptor protecting `name`, shared between all mock classes."""
+    return _NotImplementedDescriptor(name=name)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_class_attributes(c: type) -> frozenset:
+    """Returns `dir(c)`, which is slow for classes with many attributes.
+
+    Note that this is cached, so attributes added to `c` after the first mock class
+    deriving from it has been created will not be protected.
+    """
+    return frozenset(dir(c))
+
+
+@functools.lru_cache(maxsize=None)
+def _get_inherited_attributes(classes: Tuple[type, ...]) -> frozenset:
+    """Returns all attributes of `classes` that are not shared by all classes."""
+    attrs = set()
+    for c in classes:
+        attrs |= _get_class_attributes(c)
+    return frozenset(attrs - _get_default_attributes())
+
+
+@functools.lru_cache(maxsize=None)
+def _get_data_descriptors(classes: Tuple[type, ...]) -> frozenset:
+    """Returns the attributes of `classes` that are data descriptors (e.g. properties),
+    which take precedence over the instance dict when they are set or looked up."""
+    attrs = set()
+    for name in _get_inherited_attributes(classes):
+        for c in classes:
+            if name in c.__dict__:
+                if hasattr(type(c.__dict__[name]), "__set__"):
+                    attrs.add(name)
+                break
+    return frozenset(attrs)
+
+
+def _get_parents(mro: Iterable[type]) -> Tuple[type, ...]:
+    """Returns the classes in `mro` that do not also have the MockMeta metaclass."""
+    return tuple(c for c in mro if not issubclass(type(c), MockMeta))
+
+
+def _protected_attributes(mro: Iterable[type], own_attributes: set) -> frozenset:
+    """Returns the attributes that should be made inaccessible on a new mock class with
+    parent classes `mro`."""
+    # Anything that was defined (or overridden) on the subclass itself should be
+    # ignored here.
+    return _get_inherited_attributes(_get_parents(mro)) - own_attributes
 
 
 class MockMeta(type):
@@ -50,22 +103,72 @@ class MockMeta(type):
         # Then store all the keys that are defined on this subclass for future use.
         subclass.__own_attributes__ = set(dict_.keys())
 
-        # Obtain all attributes of all parent classes that do not also have the MockMeta
-        # metaclass.
-        parent_attrs = set()
-        for c in inspect.getmro(subclass)[1:]:
-            if not issubclass(type(c), MockMeta):
-                parent_attrs |= set(dir(c))
-
-        # Anything that was defined (or overridden) on the subclass itself should be
-        # ignored here.
-        parent_attrs -= subclass.__own_attributes__
-        # Any attribute shared by ALL classes (e.g. __class__) should not be
-        # overwritten either.
-        parent_attrs -= _get_default_attributes()
-
-        # All the remaining (i.e. inherited) attributes are made inaccessible.
+        # All inherited attributes are made inaccessible.
+        parent_attrs = _protected_attributes(
+            inspect.getmro(subclass)[1:], subclass.__own_attributes__
+        )
         for attr_name in parent_attrs:
-            setattr(subclass, attr_name, _NotImplementedDescriptor(name=attr_name))
+            setattr(subclass, attr_name, _get_descriptor(attr_name))
 
         return subclass
+
+
+def _guarded_getattribute(self, name: str):
+    """Replaces `__getattribute__` on instances of LazyMockMeta classes."""
+    if name in type.__getattribute__(type(self), "__protected_attributes__"):
+        # Just like with the descriptors, attributes set on the instance are fine.
+        try:
+            instance_dict = object.__getattribute__(self, "__dict__")
+        except AttributeError:
+            instance_dict = {}
+        if name not in instance_dict:
+            _get_descriptor(name).__get__(self)
+
+    return object.__getattribute__(self, name)
+
+
+class LazyMockMeta(MockMeta):
+    """Metaclass for mock classes that behaves like MockMeta, but checks whether an
+    attribute is accessible when it is looked up instead of installing a descriptor for
+    every inherited attribute. Special methods and data descriptors (e.g. properties)
+    still get descriptors, because Python does not look up the former through
+    `__getattribute__` and calls the setters of the latter when they are assigned to.
+
+    This makes creating mock classes of classes with hundreds of attributes cheaper, at
+    the cost of slower attribute access. For classes with a few dozen attributes (e.g.
+    those of google.cloud.storage) both metaclasses are about equally fast. Note that
+    any `__getattribute__` defined on the parent classes is bypassed.
+    """
+
+    def __new__(cls, name, bases, dict_):
+        # The parents of the new class are those of its bases, so everything can be
+        # added to its namespace up front. Setting special methods on an existing class
+        # is relatively slow, because Python has to update its slots.
+        mro = dict.fromkeys(c for base in bases for c in inspect.getmro(base))
+        protected = _protected_attributes(mro, set(dict_.keys()))
+        data_descriptors = _get_data_descriptors(_get_parents(mro))
+
+        namespace = dict(dict_)
+        # Python looks special methods (e.g. __len__ for len()) up on the type without
+        # going through __getattribute__, and assigning to an inherited property would
+        # call its setter, so these still need descriptors.
+        for attr_name in protected:
+            if attr_name in data_descriptors or (
+                attr_name.startswith("__") and attr_name.endswith("__")
+            ):
+                namespace[attr_name] = _get_descriptor(attr_name)
+        namespace["__own_attributes__"] = set(dict_.keys())
+        namespace["__protected_attributes__"] = protected
+        namespace["__getattribute__"] = _guarded_getattribute
+
+        return type.__new__(cls, name, bases, namespace)
+
+    def __getattribute__(cls, name: str):
+        try:
+            protected = type.__getattribute__(cls, "__protected_attributes__")
+        except AttributeError:
+            protected = ()
+        if name in protected:
+            _get_descriptor(name).__get__(None, cls)
+
+        return type.__getattribute__(cls, name)
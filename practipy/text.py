@@ -1,15 +1,22 @@
+import functools
 import re
 
-# TODO: lazily compile these.
-_c2w_re = re.compile(r"((?<=[a-z])[A-Z]|(?<!\A)[A-Z](?=[a-z]))")
-_camel_re1 = re.compile("(.)([A-Z][a-z]+)")
-_camel_re2 = re.compile("([a-z0-9])([A-Z])")
+
+# These are compiled on first use so that importing this module stays cheap.
+@functools.lru_cache(maxsize=None)
+def _compile(pattern: str) -> "re.Pattern":
+    return re.compile(pattern)
+
+
+_c2w_re = r"((?<=[a-z])[A-Z]|(?<!\A)[A-Z](?=[a-z]))"
+_camel_re1 = "(.)([A-Z][a-z]+)"
+_camel_re2 = "([a-z0-9])([A-Z])"
 
 
 def camel2words(string: str):
     """Convert CamelCase to 'spaced words' Copied from https://github.com/fastai/fastcor
     e/blob/0df9c4a8e9a1756fe26fccffab8976195563c8a9/fastcore/basics.py."""
-    return re.sub(_c2w_re, r" \1", string)
+    return _compile(_c2w_re).sub(r" \1", string)
 
 
 def camel2snake(string: str):
@@ -18,8 +25,8 @@ def camel2snake(string: str):
     Copied from
     https://github.com/fastai/fastcore/blob/0df9c4a8e9a1756fe26fccffab8976195563c8a9/fastcore/basics.py
     """
-    s1 = re.sub(_camel_re1, r"\1_\2", string)
-    return re.sub(_camel_re2, r"\1_\2", s1).lower()
+    s1 = _compile(_camel_re1).sub(r"\1_\2", string)
+    return _compile(_camel_re2).sub(r"\1_\2", s1).lower()
 
 
 def remove_prefix(string: str, prefix: str):
@@ -47,3 +47,5 @@ def typed(func: typing.Callable):
         if ret is not None and not isinstance(res, ret):
             raise _typeerr("return", res, ret)
         return res
+
+    return _f
@@ -0,0 +1,34 @@
+from unittest import mock
+
+import pytest
+
+from practipy import cache
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    disk_cache = cache.diskcache.Cache(str(tmp_path))
+    with mock.patch.object(cache, "_get_cache", lambda: disk_cache):
+        yield disk_cache
+    disk_cache.close()
+
+
+@pytest.mark.parametrize("decorator", [cache.cache_disk, cache.cache_disk(typed=True)])
+def test_cache_disk(disk_cache, decorator):
+    calls = []
+
+    @decorator
+    def double(x):
+        calls.append(x)
+        return x * 2
+
+    assert double(2) == 4
+    assert double(2) == 4
+    assert calls == [2]
+
+    # The key can be used to inspect and remove entries, like with diskcache itself.
+    key = double.__cache_key__(2)
+    assert disk_cache[key] == 4
+    del disk_cache[key]
+    assert double(2) == 4
+    assert calls == [2, 2]
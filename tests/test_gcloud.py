@@ -0,0 +1,141 @@
+import multiprocessing
+
+import pytest
+
+from practipy import gcloud
+from practipy.gcloud_testing import FakeStorage, fake_gcs
+
+# fake_gcs replaces the client in this process only. Worker processes only use the fake
+# if they are forked from it; otherwise they would try to reach the real GCS.
+requires_fork = pytest.mark.skipif(
+    multiprocessing.get_start_method() != "fork",
+    reason="Worker processes are not forked, so they would not use the fake storage.",
+)
+PROCESS_PARAMS = [(1, 1), pytest.param(3, 3, marks=requires_fork)]
+
+
+@pytest.fixture
+def storage(request):
+    # Worker processes can only use shared storage.
+    processes = getattr(request, "param", 1)
+    storage = FakeStorage(shared=processes > 1)
+    with fake_gcs(storage):
+        yield storage
+    storage.close()
+
+
+@pytest.mark.parametrize("storage, processes", PROCESS_PARAMS, indirect=["storage"])
+def test_download_files(tmp_path, storage, processes):
+    blobs = {f"source/{i}.txt": str(i).encode() for i in range(25)}
+    storage.add_blobs("bucket", blobs)
+    paths = gcloud.download_files(
+        "project",
+        "bucket",
+        list(blobs),
+        tmp_path,
+        strip_prefix="source/",
+        progress_bar=False,
+        processes=processes,
+        chunksize=4,
+    )
+
+    assert paths == [str(tmp_path / f"{i}.txt") for i in range(25)]
+    assert [(tmp_path / f"{i}.txt").read_text() for i in range(25)] == [
+        str(i) for i in range(25)
+    ]
+
+
+@pytest.mark.parametrize("storage, processes", PROCESS_PARAMS, indirect=["storage"])
+def test_download_folder(tmp_path, storage, processes):
+    storage.add_blobs(
+        "bucket", {"source/a.txt": b"a", "source/b/c.txt": b"c", "source/d/": b""}
+    )
+    gcloud.download_folder(
+        "project",
+        "gs://bucket/source",
+        tmp_path,
+        progress_bar=False,
+        processes=processes,
+        chunksize=1,
+    )
+
+    assert (tmp_path / "a.txt").read_text() == "a"
+    assert (tmp_path / "b" / "c.txt").read_text() == "c"
+    assert (tmp_path / "d").is_dir()
+
+
+@pytest.mark.parametrize("storage, processes", PROCESS_PARAMS, indirect=["storage"])
+def test_upload_folder(tmp_path, storage, processes):
+    for i in range(10):
+        (tmp_path / f"{i}.txt").write_text(str(i))
+
+    gcloud.upload_folder(
+        "project",
+        tmp_path,
+        "gs://bucket/target",
+        progress_bar=False,
+        processes=processes,
+        chunksize=3,
+    )
+
+    assert storage.buckets["bucket"] == {
+        f"target/{i}.txt": str(i).encode() for i in range(10)
+    }
+
+
+@pytest.mark.parametrize("storage, processes", PROCESS_PARAMS, indirect=["storage"])
+@pytest.mark.parametrize("strip_prefix", ["", "/"])
+def test_upload_files(tmp_path, storage, processes, strip_prefix):
+    (tmp_path / "a.txt").write_text("a")
+    gcloud.upload_files(
+        "project",
+        [tmp_path / "a.txt"],
+        "gs://bucket/target",
+        strip_prefix=str(tmp_path) + strip_prefix,
+        progress_bar=False,
+        processes=processes,
+    )
+
+    assert storage.buckets["bucket"] == {"target/a.txt": b"a"}
+
+
+@requires_fork
+def test_unshared_storage_in_processes(tmp_path, storage):
+    (tmp_path / "a.txt").write_text("a")
+    with pytest.raises(RuntimeError, match="shared=True"):
+        gcloud.upload_files(
+            "project", [tmp_path / "a.txt"], "gs://bucket/target", processes=2
+        )
+
+
+@requires_fork
+@pytest.mark.parametrize("storage", [2], indirect=True)
+def test_process_errors_per_file(tmp_path, storage):
+    storage.add_blobs("bucket", {"a.txt": b"a", "b.txt": b"b"})
+    storage.inject_error("a.txt", ConnectionError("Connection reset"))
+
+    executor, futures = gcloud._submit_transfers(
+        "project",
+        "bucket",
+        gcloud._download_blob,
+        [("a.txt", str(tmp_path / "a.txt")), ("b.txt", str(tmp_path / "b.txt"))],
+        processes=2,
+        chunksize=2,
+    )
+    with executor:
+        with pytest.raises(ConnectionError):
+            futures[0].result()
+        # Files in the same chunk that were transferred fine should not fail.
+        assert futures[1].result().target_path == str(tmp_path / "b.txt")
+
+
+@pytest.mark.parametrize("storage, processes", PROCESS_PARAMS, indirect=["storage"])
+def test_unauthenticated(tmp_path, storage, processes):
+    from google.auth.exceptions import RefreshError
+
+    storage.add_blobs("bucket", {"a.txt": b"a"})
+    storage.inject_error("a.txt", RefreshError("Reauthentication is needed."))
+    with pytest.raises(ValueError, match="gcloud auth login"):
+        gcloud.download_files(
+            "project", "bucket", ["a.txt"], tmp_path, processes=processes
+        )
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from practipy import gcloud
+from practipy.gcloud_testing import FakeClient, FakeStorage, fake_gcs
+
+
+def test_roundtrip(tmp_path):
+    (tmp_path / "source").mkdir()
+    (tmp_path / "source" / "a.txt").write_text("a")
+    (tmp_path / "source" / "b.txt").write_text("b")
+
+    with fake_gcs() as storage:
+        gcloud.upload_folder(
+            "project", tmp_path / "source", "gs://bucket/folder", progress_bar=False
+        )
+        assert storage.buckets["bucket"] == {"folder/a.txt": b"a", "folder/b.txt": b"b"}
+
+        gcloud.download_folder(
+            "project", "gs://bucket/folder", tmp_path / "target", progress_bar=False
+        )
+        assert (tmp_path / "target" / "a.txt").read_text() == "a"
+        assert (tmp_path / "target" / "b.txt").read_text() == "b"
+
+        with pytest.raises(FileNotFoundError):
+            gcloud.download_file("project", "gs://bucket/missing", tmp_path / "c.txt")
+
+
+def test_inject_error(tmp_path):
+    with fake_gcs() as storage:
+        storage.add_blobs("bucket", {"a.txt": b"a"})
+        storage.inject_error("a.txt", ConnectionError("Connection reset"))
+
+        with pytest.raises(ConnectionError):
+            gcloud.download_file("project", "gs://bucket/a.txt", tmp_path / "a.txt")
+        # The error is only raised once.
+        assert gcloud.download_file(
+            "project", "gs://bucket/a.txt", tmp_path / "a.txt"
+        )
+
+
+def test_latency_and_bandwidth(tmp_path):
+    storage = FakeStorage(latency=0.01, bandwidth=10_000)
+    with fake_gcs(storage):
+        storage.add_blobs("bucket", {"a.txt": b"a" * 1000})
+
+        start = time.perf_counter()
+        gcloud.download_file("project", "gs://bucket/a.txt", tmp_path / "a.txt")
+        # One request for the metadata and one for the download of 0.1 s.
+        assert time.perf_counter() - start >= 0.12
+
+    assert storage.num_requests == 2
+    assert storage.num_bytes == 1000
+
+
+def test_unmocked_attributes():
+    client = FakeClient("project")
+    with pytest.raises(NotImplementedError):
+        client.create_bucket("bucket")
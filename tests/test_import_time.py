@@ -0,0 +1,74 @@
+import re
+import subprocess
+import sys
+
+import pytest
+
+# Maximum cumulative import time per module in milliseconds, as reported by
+# `python -X importtime`. These are deliberately generous so that they only fail when
+# a heavy dependency starts getting imported eagerly again.
+IMPORT_TIME_BUDGETS_MS = {
+    "practipy": 20,
+    "practipy.cache": 40,
+    "practipy.classes": 20,
+    "practipy.gcloud": 40,
+    "practipy.imports": 20,
+    "practipy.iterators": 20,
+    "practipy.logs": 40,
+    "practipy.math": 20,
+    "practipy.tensorflow": 40,
+    "practipy.testing": 40,
+    "practipy.text": 20,
+    "practipy.typing": 20,
+}
+
+# Optional dependencies that should only be imported once they are actually used.
+HEAVY_MODULES = [
+    "absl",
+    "diskcache",
+    "google.auth",
+    "google.cloud.storage",
+    "multiprocessing",
+    "numpy",
+    "sqlite3",
+    "tqdm",
+]
+
+_importtime_re = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)")
+
+
+def measure_import_time(module_name: str) -> dict:
+    """Imports `module_name` in a fresh interpreter and returns the cumulative import
+    time in microseconds of every module that was imported along the way."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        match = _importtime_re.match(line)
+        if match:
+            timings[match.group(4)] = int(match.group(2))
+    return timings
+
+
+@pytest.mark.parametrize("module_name", sorted(IMPORT_TIME_BUDGETS_MS))
+def test_import_time_budget(module_name):
+    # Take the best of a few runs to reduce noise from e.g. a cold filesystem cache.
+    cumulative_us = min(
+        measure_import_time(module_name)[module_name] for _ in range(3)
+    )
+    budget_us = IMPORT_TIME_BUDGETS_MS[module_name] * 1000
+    assert cumulative_us <= budget_us, (
+        f"Importing {module_name} took {cumulative_us / 1000:.1f} ms, which exceeds "
+        f"its budget of {IMPORT_TIME_BUDGETS_MS[module_name]} ms."
+    )
+
+
+@pytest.mark.parametrize("module_name", sorted(IMPORT_TIME_BUDGETS_MS))
+def test_no_heavy_imports(module_name):
+    imported = measure_import_time(module_name)
+    eager = [m for m in HEAVY_MODULES if m in imported]
+    assert not eager, f"Importing {module_name} eagerly imports {eager}."
@@ -0,0 +1,253 @@
+import io
+import logging
+import threading
+import time
+
+import pytest
+
+from practipy.logs import redirect_logs
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("practipy.tests.logs")
+    logger.setLevel(logging.DEBUG)
+    handler = logging.StreamHandler(io.StringIO())
+    handler.setFormatter(logging.Formatter("%(levelname)s:%(message)s"))
+    logger.addHandler(handler)
+    yield logger
+    logger.removeHandler(handler)
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_redirect(logger, asynchronous):
+    file = io.StringIO()
+    logger.handlers[0].setLevel(logging.INFO)
+    with redirect_logs(logger, file=file, asynchronous=asynchronous) as redirect:
+        logger.debug("filtered")
+        logger.info("first")
+        logger.warning("second %d", 2)
+
+    assert file.getvalue() == "INFO:first\nWARNING:second 2\n"
+    assert redirect.stats.written == 2
+    assert redirect.stats.dropped == 0
+    # The original handlers should receive records again after exiting.
+    logger.info("after")
+    assert file.getvalue() == "INFO:first\nWARNING:second 2\n"
+
+
+def test_async_many_threads(logger):
+    file = io.StringIO()
+    with redirect_logs(logger, file=file, asynchronous=True, queue_size=10):
+
+        def log_many(t):
+            for i in range(100):
+                logger.info("%d-%d", t, i)
+
+        threads = [threading.Thread(target=log_many, args=(t,)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    lines = file.getvalue().splitlines()
+    assert len(lines) == 800
+    assert len(set(lines)) == 800
+
+
+class BlockingFile(io.StringIO):
+    """Blocks every write until `release` is set."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def write(self, text):
+        self.release.wait()
+        return super().write(text)
+
+
+@pytest.mark.parametrize("overflow", ["drop", "sample"])
+def test_async_overflow(logger, overflow):
+    file = BlockingFile()
+    redirect = redirect_logs(
+        logger,
+        file=file,
+        asynchronous=True,
+        queue_size=1,
+        overflow=overflow,
+        sample_every=4,
+    )
+    with redirect:
+        if overflow == "sample":
+            # The sampled records wait for room in the queue, so unblock eventually.
+            threading.Timer(0.1, file.release.set).start()
+        for i in range(10):
+            logger.info("%d", i)
+        file.release.set()
+
+    assert redirect.stats.enqueued + redirect.stats.dropped == 10
+    assert redirect.stats.written == redirect.stats.enqueued
+    assert redirect.stats.dropped > 0
+    assert len(file.getvalue().splitlines()) == redirect.stats.written
+
+
+def test_invalid_overflow():
+    with pytest.raises(ValueError):
+        redirect_logs(overflow="ignore")
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_deduplicate(logger, asynchronous):
+    file = io.StringIO()
+    with redirect_logs(
+        logger, file=file, asynchronous=asynchronous, deduplicate=True
+    ) as redirect:
+        for i in range(1000):
+            logger.info("step %d", i)
+        logger.warning("other")
+
+    lines = file.getvalue().splitlines()
+    assert lines[:2] == ["INFO:step 0", "WARNING:other"]
+    assert lines[2].startswith("INFO:Suppressed 999 repeats of 'step %d'")
+    assert len(lines) == 3
+    assert redirect.stats.deduplicated == 999
+
+
+def test_deduplicate_summary_interval(logger):
+    file = io.StringIO()
+    with redirect_logs(logger, file=file, deduplicate=True, summary_interval=0):
+        for i in range(3):
+            logger.info("step %d", i)
+
+    assert file.getvalue() == "INFO:step 0\nINFO:step 1\nINFO:step 2\n"
+
+
+def test_rate_limit(logger):
+    file = io.StringIO()
+    with redirect_logs(logger, file=file, rate_limit=1e-9, burst=5) as redirect:
+        for i in range(100):
+            logger.info("step %d", i)
+
+    lines = file.getvalue().splitlines()
+    assert lines[:5] == [f"INFO:step {i}" for i in range(5)]
+    assert lines[5] == f"INFO:Rate limited 95 records from logger {logger.name}."
+    assert len(lines) == 6
+    assert redirect.stats.rate_limited == 95
+
+
+def test_suppressed_records_are_not_formatted(logger):
+    class CountingFormatter(logging.Formatter):
+        calls = 0
+
+        def format(self, record):
+            CountingFormatter.calls += 1
+            return super().format(record)
+
+    logger.handlers[0].setFormatter(CountingFormatter())
+    with redirect_logs(logger, file=io.StringIO(), deduplicate=True):
+        for i in range(100):
+            logger.info("step %d", i)
+
+    # Only the first record and the summary.
+    assert CountingFormatter.calls == 2
+
+
+class FailingFile(io.StringIO):
+    def write(self, text):
+        raise OSError("No space left on device")
+
+
+@pytest.mark.parametrize("asynchronous", [False, True])
+def test_failing_file(logger, asynchronous):
+    handle_error_calls = []
+    logger.handlers[0].handleError = handle_error_calls.append
+
+    with redirect_logs(
+        logger, file=FailingFile(), asynchronous=asynchronous, queue_size=5
+    ) as redirect:
+        for i in range(50):
+            logger.warning("%d", i)
+
+    # Every record is attempted and the errors are reported, but nothing is written.
+    assert redirect.stats.written == 0
+    assert len(handle_error_calls) >= 1
+    if not asynchronous:
+        assert len(handle_error_calls) == 50
+
+
+def test_failing_format(logger):
+    handle_error_calls = []
+    logger.handlers[0].handleError = handle_error_calls.append
+
+    file = io.StringIO()
+    with redirect_logs(logger, file=file, asynchronous=True) as redirect:
+        logger.warning("%d", "not a number")
+        logger.warning("fine")
+
+    assert file.getvalue() == "WARNING:fine\n"
+    assert redirect.stats.written == 1
+    assert len(handle_error_calls) == 1
+
+
+def test_deduplicate_high_cardinality(logger):
+    file = io.StringIO()
+    with redirect_logs(
+        logger, file=file, deduplicate=True, summary_interval=0.05
+    ) as redirect:
+        for i in range(1000):
+            logger.info(f"step {i}")
+            logger.info(f"step {i}")
+        time.sleep(0.1)
+        logger.info("last")
+
+        # Only the templates that are still within their interval are remembered.
+        assert len(redirect._repeats) == 1
+
+    lines = file.getvalue().splitlines()
+    summaries = [line for line in lines if line.startswith("INFO:Suppressed 1 repeats")]
+    assert len(summaries) == 1000
+    assert lines[-1] == "INFO:last"
+    assert redirect.stats.deduplicated == 1000
+    assert len(lines) == 2001
+
+
+def test_async_mutated_argument(logger):
+    file = io.StringIO()
+    state = {"step": 0}
+    with redirect_logs(logger, file=file, asynchronous=True, batch_size=3):
+        for i in range(3):
+            state["step"] = i
+            logger.info("state %s", state)
+
+    assert file.getvalue().splitlines() == [
+        "INFO:state {'step': 0}",
+        "INFO:state {'step': 1}",
+        "INFO:state {'step': 2}",
+    ]
+
+
+def test_async_exception(logger):
+    file = io.StringIO()
+    with redirect_logs(logger, file=file, asynchronous=True):
+        try:
+            raise ValueError("broken")
+        except ValueError:
+            logger.exception("failed")
+
+    lines = file.getvalue().splitlines()
+    assert lines[0] == "ERROR:failed"
+    assert lines[-1] == "ValueError: broken"
+
+
+def test_rate_limit_burst_one(logger):
+    file = io.StringIO()
+    with redirect_logs(logger, file=file, rate_limit=1e-9, burst=1) as redirect:
+        for i in range(3):
+            logger.info("step %d", i)
+
+    assert file.getvalue().splitlines() == [
+        "INFO:step 0",
+        f"INFO:Rate limited 2 records from logger {logger.name}.",
+    ]
+    assert redirect.stats.rate_limited == 2
@@ -1,6 +1,6 @@
 import pytest
 
-from practipy.testing import MockMeta
+from practipy.testing import LazyMockMeta, MockMeta
 
 
 class BaseClass:
@@ -76,3 +76,133 @@ def test_protected_attributes():
 
     with pytest.raises(NotImplementedError):
         instance.function_a()
+
+
+class LazyMockedClass(BaseClass, metaclass=LazyMockMeta):
+    ANOTHER_VARIABLE = 100
+
+    def __init__(self):
+        super().__init__()
+
+    def function_b(self, *args):
+        return "Mocked value"
+
+    @property
+    def property_a(self):
+        return 3
+
+
+class LazyMockedSubclass(LazyMockedClass):
+    def function_a(self, *args):
+        return "Mocked subclass value"
+
+
+def test_lazy_overridden_attributes():
+    assert LazyMockedClass.ANOTHER_VARIABLE == 100
+
+    instance = LazyMockedClass()
+    assert instance.ANOTHER_VARIABLE == 100
+    assert instance.x == 1
+    assert instance.function_b() == "Mocked value"
+    assert instance.property_a == 3
+
+    # Attributes that are overridden on a subclass should become accessible.
+    assert LazyMockedSubclass().function_a() == "Mocked subclass value"
+
+
+def test_lazy_protected_attributes():
+    with pytest.raises(NotImplementedError):
+        LazyMockedClass.SOME_CLASS_VARIABLE
+
+    instance = LazyMockedClass()
+
+    with pytest.raises(NotImplementedError):
+        instance.SOME_CLASS_VARIABLE
+
+    with pytest.raises(NotImplementedError):
+        instance.function_a()
+
+    with pytest.raises(NotImplementedError):
+        LazyMockedClass.function_a
+
+    # Protected attributes can still be set on the instance.
+    instance.function_a = lambda: "Instance value"
+    assert instance.function_a() == "Instance value"
+
+    # Attributes are only accessible where they are overridden.
+    with pytest.raises(NotImplementedError):
+        LazyMockedSubclass().SOME_CLASS_VARIABLE
+
+
+def test_lazy_installs_no_descriptors():
+    assert "function_a" in MockedClass.__dict__
+    assert "function_a" not in LazyMockedClass.__dict__
+
+
+class ContainerClass:
+    def __len__(self):
+        return 1
+
+    def __getitem__(self, key):
+        return key
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+@pytest.mark.parametrize("metaclass", [MockMeta, LazyMockMeta])
+def test_protected_special_methods(metaclass):
+    MockedContainer = metaclass("MockedContainer", (ContainerClass,), {})
+    instance = MockedContainer()
+
+    with pytest.raises(NotImplementedError):
+        len(instance)
+
+    with pytest.raises(NotImplementedError):
+        instance[0]
+
+    with pytest.raises(NotImplementedError):
+        with instance:
+            pass
+
+
+class SettableClass:
+    def __init__(self):
+        self.setter_calls = 0
+
+    @property
+    def value(self):
+        return 0
+
+    @value.setter
+    def value(self, value):
+        self.setter_calls += 1
+
+    @property
+    def read_only(self):
+        return 0
+
+
+@pytest.mark.parametrize("metaclass", [MockMeta, LazyMockMeta])
+def test_protected_property_setter(metaclass):
+    MockedSettable = metaclass("MockedSettable", (SettableClass,), {})
+    instance = MockedSettable()
+
+    # The setter of the parent should not be called; the value is set on the instance.
+    instance.value = 1
+    assert instance.value == 1
+    assert instance.__dict__["setter_calls"] == 0
+
+
+@pytest.mark.parametrize("metaclass", [MockMeta, LazyMockMeta])
+def test_set_read_only_property_in_init(metaclass):
+    def __init__(self):
+        self.read_only = 1
+
+    MockedSettable = metaclass(
+        "MockedSettable", (SettableClass,), {"__init__": __init__}
+    )
+    assert MockedSettable().read_only == 1